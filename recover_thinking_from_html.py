@@ -6,11 +6,104 @@ When extractThinkingStages() fails to parse thinking blocks,
 this script can extract them from the raw_html field.
 """
 
+import io
 import json
+import os
 import sys
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
 from pathlib import Path
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional - fall back to the stdlib parser
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional - without it the whole export is loaded at once
+    ijson = None
+
+MESSAGE_PREFIX = 'exchanges.item.messages.item'
+STAGES_PREFIX = MESSAGE_PREFIX + '.thinking_stages'
+CONTAINER_EVENTS = ('start_map', 'end_map', 'start_array', 'end_array')
+
+# Parallel workers each hold a full raw_html string plus its DOM
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
+
+THINKING_CONTAINER_SELECTOR = (
+    '[data-test-id="model-thoughts"], '
+    '[class*="thinking" i], '
+    '[class*="thought" i]'
+)
+
+
+def load_json(path):
+    """Load a JSON file, using orjson when it is installed."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def dump_json(data, path):
+    """Write data as indented JSON, using orjson when it is installed."""
+    if orjson:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def scan_export(path):
+    """
+    Read raw_html and count captured thinking blocks in an export file.
+
+    With ijson installed the file is streamed, so the exchanges are
+    never materialized alongside the raw HTML string.
+
+    Returns (raw_html, current_thinking); raw_html is None if absent.
+    """
+    if ijson is None:
+        data = load_json(path)
+        current_thinking = sum(
+            1 for ex in data.get('exchanges', [])
+            for msg in ex.get('messages', [])
+            if msg.get('message_type') == 'thinking' and msg.get('thinking_stages')
+        )
+        return data.get('raw_html'), current_thinking
+
+    raw_html = None
+    current_thinking = 0
+    is_thinking = has_stages = False
+
+    with open(path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'raw_html':
+                if event == 'string':
+                    raw_html = value
+            elif prefix == MESSAGE_PREFIX:
+                if event == 'start_map':
+                    is_thinking = has_stages = False
+                elif event == 'end_map' and is_thinking and has_stages:
+                    current_thinking += 1
+            elif prefix == MESSAGE_PREFIX + '.message_type':
+                is_thinking = value == 'thinking'
+            elif prefix == STAGES_PREFIX:
+                # A map key means a non-empty object; scalars carry their own truthiness
+                if event == 'map_key':
+                    has_stages = True
+                elif event not in CONTAINER_EVENTS:
+                    has_stages = bool(value)
+            elif prefix == STAGES_PREFIX + '.item':
+                has_stages = True
+
+    return raw_html, current_thinking
 
 
 def extract_thinking_from_html(raw_html):
@@ -19,16 +112,25 @@ def extract_thinking_from_html(raw_html):
 
     Returns list of thinking blocks with their content.
     """
-    soup = BeautifulSoup(raw_html, 'html.parser')
+    tree = LexborHTMLParser(raw_html)
+
+    # lexbor's text() includes script/style contents; get_text() never did
+    tree.strip_tags(['script', 'style'])
 
     thinking_blocks = []
 
-    # Find all thinking block containers
-    # Try multiple possible selectors
+    # Find all thinking block containers in one traversal, then keep
+    # the most specific selector that matched anything. lexbor returns a
+    # node once per selector it matches, so drop repeats by mem_id.
+    seen = set()
+    matches = [
+        n for n in tree.css(THINKING_CONTAINER_SELECTOR)
+        if n.mem_id not in seen and not seen.add(n.mem_id)
+    ]
     containers = (
-        soup.find_all(attrs={'data-test-id': 'model-thoughts'}) or
-        soup.find_all(class_=lambda x: x and 'thinking' in x.lower()) or
-        soup.find_all(class_=lambda x: x and 'thought' in x.lower())
+        [n for n in matches if n.attributes.get('data-test-id') == 'model-thoughts'] or
+        [n for n in matches if 'thinking' in (n.attributes.get('class') or '').lower()] or
+        matches
     )
 
     for idx, container in enumerate(containers):
@@ -39,7 +141,7 @@ def extract_thinking_from_html(raw_html):
             thinking_blocks.append({
                 'block_index': idx,
                 'stages': stages,
-                'raw_text': container.get_text(strip=True)
+                'raw_text': container.text(strip=True)
             })
 
     return thinking_blocks
@@ -53,47 +155,47 @@ def extract_stages_from_container(container):
     """
     stages = []
 
-    # Get all text blocks
-    elements = container.find_all(['p', 'div'])
+    # Get all text blocks (css() also matches the container itself)
+    elements = [el for el in container.css('p, div') if el.mem_id != container.mem_id]
 
     current_stage = None
 
     for el in elements:
-        text = el.get_text(strip=True)
+        text = el.text(strip=True)
         if not text:
             continue
 
         # Check if this is a stage header (bold/strong text)
-        bold = el.find(['strong', 'b'])
+        bold = el.css_first('strong, b')
 
         if bold:
-            bold_text = bold.get_text(strip=True)
+            bold_text = bold.text(strip=True)
 
             # If the element is ONLY the bold text, it's a header
             if text == bold_text:
                 # Save previous stage
-                if current_stage and current_stage['text'].strip():
+                if current_stage and any(p.strip() for p in current_stage['parts']):
                     stages.append(current_stage)
 
                 # Start new stage
                 current_stage = {
                     'stage_name': bold_text,
-                    'text': ''
+                    'parts': []
                 }
             elif current_stage:
                 # Bold text within content - add to current stage
-                current_stage['text'] += '\n\n' + text
+                current_stage['parts'].append(text)
         elif current_stage:
             # Regular content - add to current stage
-            current_stage['text'] += '\n\n' + text
+            current_stage['parts'].append(text)
 
     # Save final stage
-    if current_stage and current_stage['text'].strip():
+    if current_stage and any(p.strip() for p in current_stage['parts']):
         stages.append(current_stage)
 
-    # Clean up stage text
+    # Join collected paragraphs into the stage text
     for stage in stages:
-        stage['text'] = stage['text'].strip()
+        stage['text'] = '\n\n'.join(stage.pop('parts')).strip()
 
     return stages
 
@@ -104,14 +206,12 @@ def recover_thinking_blocks(input_file, output_file=None):
     """
     print(f"Processing: {input_file}")
 
-    with open(input_file) as f:
-        data = json.load(f)
+    raw_html, current_thinking = scan_export(input_file)
 
-    if 'raw_html' not in data:
+    if raw_html is None:
         print("  ⚠️  No raw_html field found - this export doesn't have raw HTML")
         return
 
-    raw_html = data['raw_html']
     print(f"  Raw HTML size: {len(raw_html):,} bytes")
 
     # Extract thinking blocks from raw HTML
@@ -119,13 +219,6 @@ def recover_thinking_blocks(input_file, output_file=None):
 
     print(f"  Found {len(thinking_blocks)} thinking blocks in raw HTML")
 
-    # Count current thinking blocks in structured data
-    current_thinking = sum(
-        1 for ex in data.get('exchanges', [])
-        for msg in ex.get('messages', [])
-        if msg.get('message_type') == 'thinking' and msg.get('thinking_stages')
-    )
-
     print(f"  Current thinking blocks in JSON: {current_thinking}")
     print(f"  Missing from JSON: {len(thinking_blocks) - current_thinking}")
 
@@ -149,14 +242,42 @@ def recover_thinking_blocks(input_file, output_file=None):
         if not output_file:
             output_file = Path(input_file).with_suffix('.recovered.json')
 
-        with open(output_file, 'w') as f:
-            json.dump(recovery_data, f, indent=2)
+        dump_json(recovery_data, output_file)
 
         print(f"  Saved recovery data to: {output_file}")
     else:
         print("  ℹ️  All thinking blocks already captured in JSON")
 
 
+def _output_path(file_path, output_dir):
+    """Return the recovery output path for file_path, or None for the default."""
+    if not output_dir:
+        return None
+    filename = Path(file_path).name
+    return Path(output_dir) / f"{Path(filename).stem}.recovered.json"
+
+
+def _recover_file(file_path, output_dir):
+    """Recover a single file, reporting errors instead of raising."""
+    try:
+        recover_thinking_blocks(file_path, _output_path(file_path, output_dir))
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+
+
+def _recover_one(file_path, output_dir):
+    """
+    Recover a single file, returning its captured progress output.
+
+    Kept at module level so it can be pickled for ProcessPoolExecutor;
+    output is buffered so reports from parallel workers don't interleave.
+    """
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        _recover_file(file_path, output_dir)
+    return buf.getvalue()
+
+
 def main():
     import argparse
 
@@ -172,19 +293,39 @@ def main():
         '--output-dir',
         help='Output directory for recovered data'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f'Files to process in parallel (default: {DEFAULT_JOBS}); '
+             'each worker holds one raw_html string and its DOM in memory'
+    )
 
     args = parser.parse_args()
 
-    for file_path in args.files:
-        output_path = None
-        if args.output_dir:
-            filename = Path(file_path).name
-            output_path = Path(args.output_dir) / f"{Path(filename).stem}.recovered.json"
+    if len(args.files) == 1 or args.jobs <= 1:
+        for file_path in args.files:
+            _recover_file(file_path, args.output_dir)
+        return
 
-        try:
-            recover_thinking_blocks(file_path, output_path)
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
+    unfinished = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [
+            executor.submit(_recover_one, file_path, args.output_dir)
+            for file_path in args.files
+        ]
+        # Print in argument order as each report becomes available
+        for file_path, future in zip(args.files, futures):
+            try:
+                print(future.result(), end='', flush=True)
+            except BrokenProcessPool:
+                unfinished.append(file_path)
+
+    if unfinished:
+        print(f"✗ Worker process died; {len(unfinished)} file(s) did not finish:")
+        for file_path in unfinished:
+            print(f"  {file_path}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
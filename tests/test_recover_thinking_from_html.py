@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('selectolax')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from recover_thinking_from_html import extract_thinking_from_html  # noqa: E402
+
+
+def test_container_matching_several_selectors_is_extracted_once():
+    raw_html = (
+        '<div data-test-id="model-thoughts" class="thought">'
+        '<p><strong>Stage One</strong></p><p>alpha</p>'
+        '</div>'
+        '<div data-test-id="model-thoughts" class="thinking-thoughts">'
+        '<p><strong>Stage Two</strong></p><p>beta</p>'
+        '</div>'
+    )
+
+    blocks = extract_thinking_from_html(raw_html)
+
+    assert [b['block_index'] for b in blocks] == [0, 1]
+    assert [b['stages'][0]['stage_name'] for b in blocks] == ['Stage One', 'Stage Two']
+
+
+def test_class_only_container_matching_both_class_selectors_is_extracted_once():
+    raw_html = (
+        '<div class="thinking-thoughts">'
+        '<p><b>Only</b></p><p>gamma</p>'
+        '</div>'
+    )
+
+    blocks = extract_thinking_from_html(raw_html)
+
+    assert len(blocks) == 1
+    assert blocks[0]['stages'] == [{'stage_name': 'Only', 'text': 'gamma'}]